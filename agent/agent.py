@@ -1,18 +1,17 @@
-import os, glob
-import duckdb
-import pandas as pd
+import os
 from dotenv import load_dotenv
 from google.adk.agents import Agent, SequentialAgent, LlmAgent
 from google.adk import Runner
+
+# Load Google AI API key (required for Google ADK)
+load_dotenv()
+api_key = os.environ.get("GOOGLE_API_KEY")
+
 from .subagents.nl2sql.agent import nl2sql_agent, nl2sql_agent_v1
 from .subagents.insights.agent import response_agent
 from . import prompts
 from . import tools
 
-# Load Google AI API key (required for Google ADK)
-load_dotenv()
-api_key = os.environ.get("GOOGLE_API_KEY") 
-
 # Toggle between v1 (basic prompt) and v2 (semantic layer) agents
 # Set to nl2sql_agent_v1 to test with simpler prompt
 active_agent = nl2sql_agent  # Change to nl2sql_agent_v1 to test
@@ -0,0 +1,7 @@
+"""Generated by scripts/build_prompts.py - do not edit by hand."""
+
+CONFIG_MTIME_NS = 1788260221371423075
+
+SEMANTIC_LAYER_STR = "Table: my_df\n\n## Fields\n\n### date\n- Type: string\n- Format: YYYY-MM-DD\n- Description: Transaction date\n- Tips:\n  - Use for filtering by specific dates\n  - For date ranges, use BETWEEN or >= / <= operators\n  - Cast to DATE type if needed for date arithmetic\n\n### description\n- Type: string\n- Description: Merchant name or transaction description from the bank\n- Tips:\n  - Use LIKE with wildcards for partial matching: WHERE description LIKE '%UBER%'\n  - Same merchant may have slight variations in description\n  - Use LOWER() for case-insensitive matching\n\n### amount\n- Type: float\n- Description: Transaction amount in USD\n- Business rules:\n  - NEGATIVE values = expenses/debits (money going out)\n  - POSITIVE values = income/credits (money coming in)\n  - Refunds appear as POSITIVE amounts\n- Tips:\n  - Filter amount < 0 for expenses only\n  - Filter amount > 0 for income only\n  - Use SUM(amount) for net totals (income minus expenses)\n  - Use SUM(ABS(amount)) or SUM(amount) WHERE amount < 0 for total spending\n  - Order by amount ASC to get highest expenses first (most negative)\n\n### type\n- Type: string\n- Description: Transaction type from the bank\n- Valid values: Debit (Money withdrawn or spent), Credit (Money deposited or received), Sale (Purchase transaction (credit card)), Fee (Bank or service fee), Refund (Money returned from a purchase)\n- Tips:\n  - Prefer using amount sign (< 0 or > 0) over type for expense/income filtering\n  - Type is useful for identifying specific transaction kinds like fees or refunds\n\n### ai_category\n- Type: string\n- Description: AI-assigned spending category (primary classification)\n- Valid values: Income, Transfers, Bill Payments, Professional Services, Software Subscriptions, Fitness, Groceries, Dining, Transportation, Entertainment, Education, Utilities, Healthcare, Shopping, Travel, Gifts, Donations, Investments, Refunds, Fees, Other\n- Tips:\n  - This is the primary field for category-based analysis\n  - More consistent than bank_category across different banks\n  - Use with ai_subcategory for detailed breakdowns\n\n### ai_subcategory\n- Type: string\n- Description: AI-assigned subcategory (detailed classification within category)\n- Valid values by category:\n  - Transportation: Gas/Fuel, Rideshare, Parking, Car Insurance, Car Maintenance, Public Transit, Tolls, Other Transportation\n  - Utilities: Electricity/Gas (PG&E), Water/Sewer, Internet/Cable, Phone/Mobile, Garbage/Waste, Other Utilities\n  - Dining: Restaurants, Fast Food/Casual, Coffee Shops/Cafes, Bakery/Desserts, Food Delivery, Bars/Nightlife, Other Dining\n  - Shopping: Electronics, Clothing/Apparel, Home/Furniture, Pharmacy/Personal Care, Online Shopping, Sporting Goods, Liquor/Wine, Books/Stationery, Other Shopping\n  - Groceries: Supermarket, Specialty/Ethnic Groceries, Warehouse Club (Costco), Organic/Natural Foods, Other Groceries\n  - Healthcare: Pharmacy, Doctor/Medical, Dental, Vision/Optometry, Hospital, Medical Supplies, Other Healthcare\n  - Entertainment: Movies/Theater, Museums/Attractions, Streaming Services, Sports/Activities, Nightlife, Parks/Recreation, Other Entertainment\n  - Education: Tuition/School Fees, School Supplies, Books/Materials, Extracurricular Activities, Other Education\n  - Fitness: Gym Membership, Sports Classes, Dance/Movement, Swimming, Recreation Programs, Other Fitness\n  - Software Subscriptions: Productivity Software, Cloud Storage, Streaming (Video), Streaming (Music), Professional Tools, Other Subscriptions\n  - Travel: Airfare, Hotels/Lodging, Car Rental, Travel Activities, Other Travel\n- Tips:\n  - May be NULL for some categories (Income, Transfers, Fees, Bill Payments, Other, Gifts, Donations, Investments, Refunds)\n  - Use for detailed spending breakdowns within a category\n  - Always GROUP BY both ai_category and ai_subcategory for subcategory analysis\n\n### source\n- Type: string\n- Description: Bank account identifier (which account the transaction came from)\n- Tips:\n  - Use for filtering or grouping by account\n  - Useful for account-specific analysis\n\n### month\n- Type: string\n- Format: YYYY-MM\n- Description: Year and month of the transaction\n- Tips:\n  - Pre-computed for easy monthly aggregations\n  - Use GROUP BY month for monthly trends\n  - Use ORDER BY month for chronological sorting\n\n### year\n- Type: integer\n- Description: Year of the transaction\n- Tips:\n  - Pre-computed for easy yearly aggregations\n  - Use for year-over-year comparisons\n  - Filter with year = 2025, not year = '2025' (it's an integer)\n\n## Important Business Rules\n- Expenses are negative, income is positive: To get 'top spending', ORDER BY amount ASC (most negative first)\n- Refunds are categorized with original merchant category: Amazon refund = Shopping category, not a separate Refunds category\n- Some categories don't have subcategories: Income, Fees, Bill Payments, Other, Gifts typically have NULL subcategory\n- A pre-aggregated rollup table monthly_category_totals(year, month, ai_category, total, n) exists: Prefer it over scanning my_df when a question only needs monthly and/or per-category totals or counts\n\n## Common Query Patterns\n- expenses_only: `WHERE amount < 0`\n- income_only: `WHERE amount > 0`\n- specific_year: `WHERE year = 2025`\n- specific_month: `WHERE month = '2025-01'`\n- date_range: `WHERE date BETWEEN '2025-01-01' AND '2025-12-31'`\n- category_filter: `WHERE ai_category = 'Dining'`\n- monthly_category_rollup: `SELECT total FROM monthly_category_totals WHERE month = '2025-01' AND ai_category = 'Dining'`\n- subcategory_filter: `WHERE ai_category = 'Dining' AND ai_subcategory = 'Restaurants'`\n- merchant_search: `WHERE LOWER(description) LIKE '%amazon%'`"
+
+SQL_EXAMPLES_STR = "## SQL Examples\n\n### Example 1: What was my total spending in 2025?\n```sql\nSELECT SUM(amount) AS total_spent\nFROM my_df\nWHERE amount < 0 AND year = 2025\n```\nExplanation: Filter for expenses (amount < 0) and the specific year. Result will be negative.\n\n### Example 2: How much income did I receive in 2025?\n```sql\nSELECT SUM(amount) AS total_income\nFROM my_df\nWHERE amount > 0 AND year = 2025\n```\nExplanation: Filter for income (amount > 0). Result will be positive.\n\n### Example 3: What is my net savings for 2025?\n```sql\nSELECT SUM(amount) AS net_savings\nFROM my_df\nWHERE year = 2025\n```\nExplanation: Sum all amounts (income minus expenses). Positive = savings, negative = overspent.\n\n### Example 4: How much did I spend on dining in January 2025?\n```sql\nSELECT total AS total_spent\nFROM monthly_category_totals\nWHERE month = '2025-01' AND ai_category = 'Dining'\n```\nExplanation: Monthly per-category totals are pre-aggregated in monthly_category_totals - use it instead of scanning my_df.\n\n### Example 5: What are my top 5 expense categories?\n```sql\nSELECT\n  ai_category,\n  SUM(amount) AS total_spent,\n  COUNT(*) AS transaction_count\nFROM my_df\nWHERE amount < 0\nGROUP BY ai_category\nORDER BY total_spent ASC\nLIMIT 5\n```\nExplanation: Group by category, order ASC because expenses are negative (most negative = highest spending).\n"
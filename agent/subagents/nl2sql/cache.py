@@ -0,0 +1,173 @@
+"""
+Semantic cache for the NL2SQL agent.
+
+Stores (embedding, question, sql, answer) entries and returns a previously
+generated answer when a new question is a close paraphrase of one already
+answered, skipping the Gemini round-trip entirely. The hot path here is
+LLM-bound, so a cache hit saves the full model latency and token cost.
+
+Embeddings use sentence-transformers (all-MiniLM-L6-v2) when installed;
+otherwise a lightweight hashed bag-of-words vector is used so the cache
+works without extra dependencies (with a slightly stricter notion of
+"paraphrase").
+"""
+
+import re
+import hashlib
+
+import numpy as np
+
+# Cosine similarity above this counts as a paraphrase of a cached question
+SIMILARITY_THRESHOLD = 0.92
+
+# Dimension of the fallback hashed bag-of-words embedding
+_HASH_DIM = 384
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Lazily-loaded sentence-transformers model (None until first use, False if unavailable)
+_st_model = None
+
+
+def _get_st_model():
+    """Load the sentence-transformers model once, or mark it unavailable."""
+    global _st_model
+    if _st_model is None:
+        try:
+            from sentence_transformers import SentenceTransformer
+            _st_model = SentenceTransformer('all-MiniLM-L6-v2')
+        except ImportError:
+            _st_model = False
+    return _st_model
+
+
+def _hash_embed(text: str) -> np.ndarray:
+    """Hashed bag-of-words embedding: cheap, dependency-free fallback."""
+    vec = np.zeros(_HASH_DIM, dtype=np.float32)
+    for word in _WORD_RE.findall(text.lower()):
+        digest = hashlib.md5(word.encode()).digest()
+        idx = int.from_bytes(digest[:4], 'little') % _HASH_DIM
+        sign = 1.0 if digest[4] & 1 else -1.0
+        vec[idx] += sign
+    norm = np.linalg.norm(vec)
+    if norm > 0:
+        vec /= norm
+    return vec
+
+
+def embed_question(question: str) -> np.ndarray:
+    """Embed a question into a unit-norm float32 vector."""
+    model = _get_st_model()
+    if model:
+        vec = model.encode(question, normalize_embeddings=True)
+        return np.asarray(vec, dtype=np.float32)
+    return _hash_embed(question)
+
+
+class SemanticCache:
+    """
+    In-memory semantic cache keyed by sentence-embedding similarity.
+
+    Entries are (embedding, question, sql, answer) tuples. Lookup computes
+    cosine similarity against all stored embeddings with a single matrix
+    product over a stacked (N, dim) float32 matrix.
+    """
+
+    def __init__(self, threshold: float = SIMILARITY_THRESHOLD, max_entries: int = 256):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.entries = []  # list of (embedding, question, sql, answer)
+        self._matrix = None  # stacked embeddings, rebuilt lazily after store()
+
+    def lookup(self, question: str):
+        """
+        Return the cached (question, sql, answer) for the closest stored
+        question if its similarity exceeds the threshold, else None.
+        """
+        if not self.entries:
+            return None
+
+        query_vec = embed_question(question)
+
+        if self._matrix is None:
+            self._matrix = np.stack([e[0] for e in self.entries])
+
+        # All embeddings are unit-norm, so dot product == cosine similarity
+        similarities = self._matrix @ query_vec
+        best_idx = int(np.argmax(similarities))
+
+        if similarities[best_idx] > self.threshold:
+            _, cached_question, sql, answer = self.entries[best_idx]
+            return cached_question, sql, answer
+
+        return None
+
+    def store(self, question: str, sql, answer: str) -> None:
+        """Record a question with its generated SQL and final answer."""
+        if len(self.entries) >= self.max_entries:
+            self.entries.pop(0)  # evict oldest
+
+        self.entries.append((embed_question(question), question, sql, answer))
+        self._matrix = None
+
+
+# Shared cache for the nl2sql agent (one per process, like `con` in tools.py)
+question_cache = SemanticCache()
+
+
+def _extract_user_question(llm_request) -> str:
+    """Pull the latest user-authored text out of an ADK LlmRequest."""
+    for content in reversed(llm_request.contents or []):
+        if content.role != 'user' or not content.parts:
+            continue
+        texts = [part.text for part in content.parts if getattr(part, 'text', None)]
+        if texts:
+            return " ".join(texts)
+    return ""
+
+
+def semantic_cache_before_model(callback_context, llm_request):
+    """
+    ADK before_model_callback: on a cache hit, answer from the cache and
+    skip the model call entirely.
+    """
+    from google.adk.models import LlmResponse
+    from google.genai import types
+
+    question = _extract_user_question(llm_request)
+    if not question:
+        return None
+
+    hit = question_cache.lookup(question)
+    if hit is None:
+        # Remember the question so the after-model callback can store the answer
+        callback_context.state['_pending_cache_question'] = question
+        return None
+
+    _, _, answer = hit
+    return LlmResponse(
+        content=types.Content(role="model", parts=[types.Part(text=answer)])
+    )
+
+
+def semantic_cache_after_model(callback_context, llm_response):
+    """ADK after_model_callback: record the model's final answer for future hits."""
+    question = callback_context.state.get('_pending_cache_question')
+    if not question or not llm_response.content or not llm_response.content.parts:
+        return None
+
+    # Only cache the finished answer. A turn carrying a function_call is an
+    # intermediate step - Gemini often pairs the call with a text preamble
+    # ("I'll query the data..."), and caching that would replay the preamble
+    # with no data on the next paraphrase. Streaming partials likewise.
+    if getattr(llm_response, 'partial', False):
+        return None
+    if any(getattr(part, 'function_call', None) for part in llm_response.content.parts):
+        return None
+
+    texts = [part.text for part in llm_response.content.parts if getattr(part, 'text', None)]
+    if texts:
+        question_cache.store(question, callback_context.state.get('generated_sql_query'), " ".join(texts))
+        callback_context.state['_pending_cache_question'] = None
+
+    return None
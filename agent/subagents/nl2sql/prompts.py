@@ -1,10 +1,13 @@
+import functools
 import os
-import yaml
+import pickle
+import types
 
 # =============================================================================
 # YAML CONFIG LOADERS
 # =============================================================================
 
+
 def _get_config_path(filename: str) -> str:
     """Get the path to a config file in agent/config/"""
     current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -12,18 +15,50 @@ def _get_config_path(filename: str) -> str:
     return os.path.join(agent_dir, 'config', filename)
 
 
-def load_semantic_layer() -> dict:
-    """Load the semantic layer configuration."""
-    config_path = _get_config_path('semantic_layer.yaml')
+def _load_config(filename: str) -> dict:
+    """
+    Load a YAML config, preferring a pickled sibling written on a previous
+    run. Unpickling takes microseconds where YAML parsing takes milliseconds;
+    the pickle is refreshed whenever the YAML file is newer.
+    """
+    config_path = _get_config_path(filename)
+    cache_path = config_path + '.pkl'
+
+    try:
+        if os.path.getmtime(cache_path) >= os.path.getmtime(config_path):
+            with open(cache_path, 'rb') as f:
+                return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        pass  # no cache yet, or stale/corrupt - reparse the YAML
+
+    # Imported here so the (slow) yaml module stays off the import path
+    # entirely once the pickle cache is warm
+    import yaml
+
     with open(config_path, 'r') as f:
-        return yaml.safe_load(f)
+        # Prefer the C parser when PyYAML was built with libyaml (~10x faster)
+        config = yaml.load(f, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
+
+    try:
+        with open(cache_path, 'wb') as f:
+            pickle.dump(config, f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        pass  # read-only install; parsing each start still works
+
+    return config
 
 
+@functools.lru_cache(maxsize=None)
+def load_semantic_layer() -> dict:
+    """Load the semantic layer configuration (parsed once per process)."""
+    # Read-only view so callers can't mutate the cached config
+    return types.MappingProxyType(_load_config('semantic_layer.yaml'))
+
+
+@functools.lru_cache(maxsize=None)
 def load_sql_examples() -> dict:
-    """Load the SQL examples configuration."""
-    config_path = _get_config_path('sql_examples.yaml')
-    with open(config_path, 'r') as f:
-        return yaml.safe_load(f)
+    """Load the SQL examples configuration (parsed once per process)."""
+    return types.MappingProxyType(_load_config('sql_examples.yaml'))
 
 
 def format_semantic_layer(semantic_layer: dict) -> str:
@@ -158,22 +193,51 @@ You: "Your total spend in 2025 was $45,678.90"
 """
 
 
+def _prebuilt_prompt_fragments():
+    """
+    Return (semantic_str, examples_str) from the generated constants module
+    if it exists and is not stale relative to the YAML configs, else None.
+    The constants are produced by scripts/build_prompts.py, moving the whole
+    formatting pass from runtime to build time.
+    """
+    try:
+        from . import _prompt_constants
+    except ImportError:
+        return None
+
+    current_mtime_ns = max(
+        os.stat(_get_config_path(name)).st_mtime_ns
+        for name in ('semantic_layer.yaml', 'sql_examples.yaml')
+    )
+    if current_mtime_ns > _prompt_constants.CONFIG_MTIME_NS:
+        return None  # YAML edited since last build - fall back to live render
+
+    return _prompt_constants.SEMANTIC_LAYER_STR, _prompt_constants.SQL_EXAMPLES_STR
+
+
+@functools.lru_cache(maxsize=None)
 def get_nl2sql_instruction_v2(max_rows: int = 10) -> str:
     """
     Generate the v2 system instruction with semantic layer and SQL examples.
 
+    The rendered instruction is deterministic for a given max_rows, so it is
+    memoized - repeated agent constructions skip the YAML load and the
+    multi-KB string build. When the pre-built constants from
+    scripts/build_prompts.py are current, even the first call is just an
+    f-string interpolation.
+
     This version:
     - Uses the semantic layer for field descriptions and business rules
     - Includes curated SQL examples for few-shot learning
     - Auto-executes SQL using execute_sql_tool
     """
-    # Load configurations
-    semantic_layer = load_semantic_layer()
-    sql_examples = load_sql_examples()
-
-    # Format into readable strings
-    semantic_str = format_semantic_layer(semantic_layer)
-    examples_str = format_sql_examples(sql_examples, limit=5)
+    prebuilt = _prebuilt_prompt_fragments()
+    if prebuilt is not None:
+        semantic_str, examples_str = prebuilt
+    else:
+        # Load configurations and format into readable strings
+        semantic_str = format_semantic_layer(load_semantic_layer())
+        examples_str = format_sql_examples(load_sql_examples(), limit=5)
 
     instruction = f"""You are a financial analyst assistant with SQL expertise and access to transaction data.
 
@@ -198,6 +262,7 @@ When the user asks a question:
 
 # Response Guidelines
 
+- execute_sql_tool returns results as JSON with "columns" and "rows" keys (CSV for large result sets)
 - Format currency values with $ symbol and commas (e.g., $1,234.56)
 - Be concise and helpful
 - If results are empty, explain that no data was found
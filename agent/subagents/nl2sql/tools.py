@@ -1,63 +1,34 @@
-import pandas as pd
+import csv
+import functools
+import io
+import json
 import os
-import duckdb
-from dotenv import load_dotenv
+import re
 
-# Load environment variables
-load_dotenv()
 
-def extract_schema_from_dataframe(df, table_name="my_df"):
-    """
-    Extract SQL schema from a pandas DataFrame.
+_STAMP_PATH = os.path.join(
+    os.path.expanduser('~'), '.cache', 'finance-agent', 'latest.json'
+)
 
-    Args:
-        df: pandas.DataFrame - The dataframe to extract schema from
-        table_name: str - Name for the table in the schema (default: "my_df")
 
-    Returns:
-        str - SQL CREATE TABLE statement
+def _find_latest_classified(classified_dir: str) -> str:
     """
-    schema_parts = [f"CREATE TABLE {table_name} ("]
-
-    for col in df.columns:
-        dtype = df[col].dtype
-
-        # Map pandas dtypes to SQL types
-        if dtype == 'object':
-            sql_type = "VARCHAR"
-        elif dtype in ['int64', 'int32']:
-            sql_type = "INTEGER"
-        elif dtype in ['float64', 'float32']:
-            sql_type = "FLOAT"
-        elif dtype == 'bool':
-            sql_type = "BOOLEAN"
-        elif 'datetime' in str(dtype):
-            sql_type = "TIMESTAMP"
-        else:
-            sql_type = "VARCHAR"  # fallback
-
-        schema_parts.append(f"    {col} {sql_type},")
-
-    # Remove last comma and close
-    schema_parts[-1] = schema_parts[-1].rstrip(',')
-    schema_parts.append(")")
-
-    return "\n".join(schema_parts)
+    Find the most recent classified_by_merchant file in classified_dir.
 
-# Get database path from environment variable
-# Default to project data folder if not set
-db_path = os.environ.get('FINANCE_DB_PATH')
+    The glob + sort is cached in a stamp file keyed by the directory's
+    mtime, so process starts only pay for a single os.stat unless new
+    files have actually appeared in the directory.
+    """
+    dir_mtime_ns = os.stat(classified_dir).st_mtime_ns
 
-if db_path:
-    # User specified a custom path (e.g., in encrypted folder)
-    csv_path = db_path
-else:
-    # Fallback to default project location - find latest classified file
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    project_root = os.path.dirname(os.path.dirname(os.path.dirname(current_dir)))
-    classified_dir = os.path.join(project_root, 'data', '3_classified')
+    try:
+        with open(_STAMP_PATH, 'r') as f:
+            stamp = json.load(f)
+        if stamp.get('dir') == classified_dir and stamp.get('dir_mtime_ns') == dir_mtime_ns:
+            return stamp['csv_path']
+    except (OSError, ValueError, KeyError):
+        pass  # no stamp yet, or unreadable - fall through to the glob
 
-    # Find the most recent classified_by_merchant file
     import glob
     classified_files = glob.glob(os.path.join(classified_dir, 'classified_by_merchant_*.csv'))
 
@@ -71,20 +42,156 @@ else:
     # Use the most recent file (sorted by filename, which includes timestamp)
     csv_path = sorted(classified_files)[-1]
 
-# Validate file exists
-if not os.path.exists(csv_path):
-    raise FileNotFoundError(
-        f"Transaction data file not found at: {csv_path}\n"
-        f"Please set FINANCE_DB_PATH environment variable to point to your classified transactions CSV,\n"
-        f"or run classify_by_merchant.py to generate classified transactions"
-    )
+    try:
+        os.makedirs(os.path.dirname(_STAMP_PATH), exist_ok=True)
+        with open(_STAMP_PATH, 'w') as f:
+            json.dump({'dir': classified_dir, 'dir_mtime_ns': dir_mtime_ns, 'csv_path': csv_path}, f)
+    except OSError:
+        pass  # cache dir not writable; the glob just runs again next start
 
-# Load data
-my_df = pd.read_csv(csv_path)
+    return csv_path
 
-con = duckdb.connect(database=':memory:')
 
-con.register('my_df', my_df)
+@functools.cache
+def _resolve_csv_path() -> str:
+    """
+    Resolve the transaction CSV: FINANCE_DB_PATH if set, otherwise the most
+    recent classified file in the project data folder.
+    """
+    db_path = os.environ.get('FINANCE_DB_PATH')
+
+    if db_path:
+        # User specified a custom path (e.g., in encrypted folder)
+        csv_path = db_path
+    else:
+        # Fallback to default project location - find latest classified file
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        project_root = os.path.dirname(os.path.dirname(os.path.dirname(current_dir)))
+        classified_dir = os.path.join(project_root, 'data', '3_classified')
+
+        csv_path = _find_latest_classified(classified_dir)
+
+    # Validate file exists
+    if not os.path.exists(csv_path):
+        raise FileNotFoundError(
+            f"Transaction data file not found at: {csv_path}\n"
+            f"Please set FINANCE_DB_PATH environment variable to point to your classified transactions CSV,\n"
+            f"or run classify_by_merchant.py to generate classified transactions"
+        )
+
+    return csv_path
+
+
+@functools.cache
+def _get_con():
+    """
+    Lazily create and populate the shared DuckDB connection.
+
+    duckdb and dotenv are imported here rather than at module level so that
+    merely importing this module (or the agent package) doesn't pay their
+    import cost - the database is only opened on the first query or schema
+    request.
+    """
+    import duckdb
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+    csv_path = _resolve_csv_path()
+    print(f"Loading transaction data from: {csv_path}")
+
+    # Load data directly into DuckDB - no intermediate pandas DataFrame.
+    # On first load, persist the table to Parquet so subsequent starts can
+    # memory-map the columnar file instead of re-parsing the CSV.
+    # The connection is explicitly configured for the known analytical
+    # workload: all cores for scans, a memory cap so a huge CSV can't OOM
+    # the process, and the object cache for repeated Parquet metadata reads.
+    con = duckdb.connect(database=':memory:', config={
+        'threads': os.cpu_count(),
+        'memory_limit': '2GB',
+        'enable_object_cache': 'true',
+    })
+
+    # Opt-in query profiling for chasing down slow generated SQL
+    if os.environ.get('FINANCE_DB_PROFILE'):
+        con.execute("PRAGMA enable_profiling='json'")
+
+    parquet_path = os.path.splitext(csv_path)[0] + '.parquet'
+
+    if os.path.exists(parquet_path) and os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path):
+        # Parquet copy is up to date - zero-copy memory-mapped access
+        con.execute(f"CREATE VIEW my_df AS SELECT * FROM '{parquet_path}'")
+    else:
+        try:
+            # Cast once at load so every later WHERE year=... / SUM(amount) is
+            # a direct typed scan instead of a runtime CAST per row
+            con.execute(
+                "CREATE TABLE my_df AS SELECT * FROM read_csv_auto(?, HEADER=TRUE, "
+                "types={'date': 'DATE', 'amount': 'DOUBLE', 'year': 'INTEGER'})",
+                [csv_path],
+            )
+        except Exception:
+            # Custom FINANCE_DB_PATH files may not have these columns
+            con.execute("CREATE TABLE my_df AS SELECT * FROM read_csv_auto(?, HEADER=TRUE)", [csv_path])
+
+        try:
+            # Dictionary-encode the AI category column: enum ordinals are a
+            # fraction of the size of the strings and GROUP BY hashes integers
+            con.execute(
+                "CREATE TYPE category_t AS ENUM "
+                "(SELECT DISTINCT ai_category FROM my_df WHERE ai_category IS NOT NULL)"
+            )
+            con.execute("ALTER TABLE my_df ALTER ai_category TYPE category_t")
+        except Exception:
+            pass  # column missing in custom datasets; strings still work
+
+        try:
+            con.execute(f"COPY my_df TO '{parquet_path}' (FORMAT PARQUET, COMPRESSION ZSTD)")
+        except Exception:
+            pass  # data dir may be read-only; the in-memory table still works
+
+    # Materialize the dominant aggregation shape once: monthly totals per
+    # category. Questions like "total spend in January 2025" or "top category
+    # last month" then hit a ~hundred-row rollup instead of re-scanning the
+    # full transactions table on every turn.
+    try:
+        con.execute(
+            "CREATE TABLE monthly_category_totals AS "
+            "SELECT year, month, ai_category, SUM(amount) AS total, COUNT(*) AS n "
+            "FROM my_df GROUP BY year, month, ai_category"
+        )
+    except Exception:
+        pass  # custom datasets without these columns fall back to my_df scans
+
+    return con
+
+
+@functools.lru_cache(maxsize=None)
+def extract_schema(table_name: str = "my_df") -> str:
+    """
+    Extract SQL schema for a DuckDB table as a CREATE TABLE statement.
+
+    The table is loaded once and never altered afterwards, so the rendered
+    schema string is cached per table name.
+
+    Args:
+        table_name: str - Name of the table in the DuckDB catalog (default: "my_df")
+
+    Returns:
+        str - SQL CREATE TABLE statement
+    """
+    columns = _get_con().execute(f"DESCRIBE {table_name}").fetchall()
+
+    schema_parts = [f"CREATE TABLE {table_name} ("]
+
+    for col_name, col_type, *_ in columns:
+        schema_parts.append(f"    {col_name} {col_type},")
+
+    # Remove last comma and close
+    schema_parts[-1] = schema_parts[-1].rstrip(',')
+    schema_parts.append(")")
+
+    return "\n".join(schema_parts)
 
 # SQL Safety: Forbidden keywords to prevent data modification
 FORBIDDEN_SQL_KEYWORDS = (
@@ -93,6 +200,17 @@ FORBIDDEN_SQL_KEYWORDS = (
     "PRAGMA", "VACUUM", "GRANT", "REVOKE"
 )
 
+# Compiled once: a single alternation scan beats 14 separate substring scans.
+# Word boundaries avoid false positives on column names like created_at.
+_FORBIDDEN_RE = re.compile(
+    r"\b(?:" + "|".join(FORBIDDEN_SQL_KEYWORDS) + r")\b",
+    re.IGNORECASE,
+)
+
+# Must start with SELECT or WITH (for CTEs); case-insensitive so no
+# uppercased copy of the full query string is ever allocated
+_PREFIX_RE = re.compile(r"\s*(?:SELECT|WITH)\b", re.IGNORECASE)
+
 def is_safe_sql(sql: str) -> bool:
     """
     Validate that SQL query is read-only and safe to execute.
@@ -103,22 +221,57 @@ def is_safe_sql(sql: str) -> bool:
     Returns:
         bool: True if query is safe (SELECT only), False otherwise
     """
-    sql_upper = sql.upper().strip()
+    return bool(_PREFIX_RE.match(sql)) and _FORBIDDEN_RE.search(sql) is None
 
-    # Must start with SELECT or WITH (for CTEs)
-    if not (sql_upper.startswith("SELECT") or sql_upper.startswith("WITH")):
-        return False
-
-    # Must not contain any forbidden keywords
-    if any(keyword in sql_upper for keyword in FORBIDDEN_SQL_KEYWORDS):
-        return False
+def _render_result(columns, rows) -> str:
+    """
+    Render fetched rows for the LLM.
 
-    return True
+    Markdown tables cost roughly 2-3x the tokens of the same data as JSON
+    or CSV, which inflates context for every downstream turn. Small result
+    sets go out as compact JSON ({"columns": ..., "rows": ...}); anything
+    larger falls back to CSV, which has no per-row key/bracket overhead.
+    """
+    if len(rows) <= 20:
+        return json.dumps({"columns": list(columns), "rows": rows}, default=str)
+
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(columns)
+    writer.writerows(rows)
+    return buf.getvalue()
+
+# Exact-match result cache. The LLM frequently regenerates textually
+# identical SQL across turns, so reformatted duplicates share an entry via
+# the whitespace-normalized key - but the normalized text is ONLY a key:
+# collapsing whitespace can change semantics inside string literals (e.g.
+# WHERE description = 'AMAZON  MKTP US'), so the original query is what
+# executes on a miss. data_mtime_ns is part of the key purely so cached
+# results are invalidated if the underlying CSV changes.
+_RESULT_CACHE_MAX = 256
+_result_cache = {}  # (norm_sql, data_mtime_ns) -> rendered result
+
+
+def _run_query(sql: str) -> str:
+    """Execute a validated query and render the result."""
+    # Execute on a per-call cursor: cursors share the catalog and buffer
+    # cache but let concurrent agent turns run in parallel instead of
+    # serializing on the shared connection
+    rel = _get_con().cursor().sql(sql)
+    columns = rel.columns
+    rows = rel.fetchall()
+
+    if not rows:
+        return "Query executed successfully but returned no data."
+
+    # Format as string so the LLM can read it
+    return _render_result(columns, rows)
 
 def execute_sql_tool(sql_query: str) -> str:
     """
-    Executes a read-only SQL query against the DuckDB instance and returns the results
-    as a Markdown-formatted table string (or a simple text string if it's one number).
+    Executes a read-only SQL query against the DuckDB instance and returns the
+    results as compact JSON with "columns" and "rows" keys (CSV for large
+    result sets).
 
     SECURITY: Only SELECT queries are allowed. Any attempt to modify data will be rejected.
     """
@@ -133,21 +286,25 @@ def execute_sql_tool(sql_query: str) -> str:
                 "This is a read-only database for financial analysis."
             )
 
-        # 2. Execute the safe query
-        df = con.sql(sql_clean).df()
-
-        # 3. Check if empty
-        if df.empty:
-            return "Query executed successfully but returned no data."
-
-        # 4. Format as string so the LLM can read it
-        # Converting to Markdown allows the LLM to understand columns vs rows
-        return df.to_markdown(index=False)
+        # 2. Check the result cache (keyed on whitespace-normalized text so
+        # trivially reformatted queries share an entry); on a miss, execute
+        # the query exactly as written
+        norm_sql = " ".join(sql_clean.split())
+        data_mtime_ns = os.stat(_resolve_csv_path()).st_mtime_ns
+        key = (norm_sql, data_mtime_ns)
+
+        result = _result_cache.get(key)
+        if result is None:
+            result = _run_query(sql_clean)
+            if len(_result_cache) >= _RESULT_CACHE_MAX:
+                _result_cache.pop(next(iter(_result_cache)))  # evict oldest
+            _result_cache[key] = result
+        return result
 
     except Exception as e:
         # Return the error so the Agent knows it failed and can try to fix the SQL
         return f"SQL Error: {str(e)}"
 
 # Usage:
-#schema = extract_schema_from_dataframe(my_df)
-#print(schema)
\ No newline at end of file
+#schema = extract_schema()
+#print(schema)
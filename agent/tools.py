@@ -1,44 +1,57 @@
+import functools
+
 import pandas as pd
 
+# Map pandas dtypes to SQL types (dict lookup instead of an if/elif chain)
+_DTYPE_MAP = {
+    "object": "VARCHAR",
+    "int64": "INTEGER",
+    "int32": "INTEGER",
+    "float64": "FLOAT",
+    "float32": "FLOAT",
+    "bool": "BOOLEAN",
+}
+
+
+def _sql_type_for(dtype_str: str) -> str:
+    """Map a pandas dtype string to a SQL type."""
+    if "datetime" in dtype_str:
+        return "TIMESTAMP"
+    return _DTYPE_MAP.get(dtype_str, "VARCHAR")  # fallback
+
+
+@functools.lru_cache(maxsize=None)
+def _schema_cached(table_name: str, dtypes_tuple: tuple) -> str:
+    """Build the CREATE TABLE string for a (table_name, dtypes) pair once."""
+    schema_parts = [f"CREATE TABLE {table_name} ("]
+
+    for col, dtype_str in dtypes_tuple:
+        schema_parts.append(f"    {col} {_sql_type_for(dtype_str)},")
+
+    # Remove last comma and close
+    schema_parts[-1] = schema_parts[-1].rstrip(',')
+    schema_parts.append(")")
+
+    return "\n".join(schema_parts)
+
 
 def extract_schema_from_dataframe(df, table_name="my_df"):
     """
     Extract SQL schema from a pandas DataFrame.
-    
+
+    The schema is deterministic for a given set of column dtypes, so the
+    string build is cached - repeated imports and test runs skip the loop.
+
     Args:
         df: pandas.DataFrame - The dataframe to extract schema from
         table_name: str - Name for the table in the schema (default: "my_df")
-    
+
     Returns:
         str - SQL CREATE TABLE statement
     """
-    schema_parts = [f"CREATE TABLE {table_name} ("]
-    
-    for col in df.columns:
-        dtype = df[col].dtype
-        
-        # Map pandas dtypes to SQL types
-        if dtype == 'object':
-            sql_type = "VARCHAR"
-        elif dtype in ['int64', 'int32']:
-            sql_type = "INTEGER"
-        elif dtype in ['float64', 'float32']:
-            sql_type = "FLOAT"
-        elif dtype == 'bool':
-            sql_type = "BOOLEAN"
-        elif 'datetime' in str(dtype):
-            sql_type = "TIMESTAMP"
-        else:
-            sql_type = "VARCHAR"  # fallback
-        
-        schema_parts.append(f"    {col} {sql_type},")
-    
-    # Remove last comma and close
-    schema_parts[-1] = schema_parts[-1].rstrip(',')
-    schema_parts.append(")")
-    
-    return "\n".join(schema_parts)
+    dtypes_tuple = tuple((col, str(df[col].dtype)) for col in df.columns)
+    return _schema_cached(table_name, dtypes_tuple)
 
 # Usage:
 #schema = extract_schema_from_dataframe(my_df)
-#print(schema)
\ No newline at end of file
+#print(schema)
@@ -17,6 +17,7 @@ Standard Schema:
 
 from abc import ABC, abstractmethod
 from typing import Optional, List
+import numpy as np
 import pandas as pd
 from datetime import datetime
 import re
@@ -71,9 +72,28 @@ class BankAdapter(ABC):
         Returns:
             DataFrame with month and year columns added
         """
-        df['date'] = pd.to_datetime(df['date'])
-        df['month'] = df['date'].dt.strftime('%Y-%m')
+        if df['date'].dtype == object:
+            # Statement CSVs repeat the same date string many times; parse
+            # each unique string once and map back instead of re-parsing
+            # the full column row by row
+            uniq = pd.unique(df['date'])
+            mapping = dict(zip(uniq, pd.to_datetime(uniq, format='mixed')))
+            df['date'] = df['date'].map(mapping)
+        else:
+            df['date'] = pd.to_datetime(df['date'], cache=True)
+        # to_period('M') renders YYYY-MM through pandas' C path instead of
+        # calling platform strftime once per element
+        df['month'] = df['date'].dt.to_period('M').astype(str)
         df['year'] = df['date'].dt.year
+
+        # Compact the standardized frame: these string columns repeat
+        # heavily (a statement has far fewer distinct merchants, types and
+        # months than rows), so category dtype stores each distinct value
+        # once and downstream groupbys hash integer codes instead of strings
+        for col in ('description', 'type', 'category', 'source', 'month'):
+            if col in df.columns:
+                df[col] = df[col].astype('category')
+
         return df
 
     def _add_source(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -90,6 +110,26 @@ class BankAdapter(ABC):
         return df
 
 
+def _strip_money(series: pd.Series) -> pd.Series:
+    """Remove $ and thousands separators from a string amount column."""
+    # Two vectorized literal replaces beat a per-cell regex substitution
+    return series.str.replace('$', '', regex=False).str.replace(',', '', regex=False)
+
+
+def _find_header_row(file_path: str, needle: bytes) -> int:
+    """
+    Return the index of the first line containing needle, or 0 if absent.
+
+    Scans the file lazily in binary mode and short-circuits at the match -
+    the line list is never materialized.
+    """
+    with open(file_path, 'rb') as f:
+        for i, line in enumerate(f):
+            if needle in line:
+                return i
+    return 0
+
+
 class ChaseCreditAdapter(BankAdapter):
     """Adapter for Chase credit card CSV exports."""
 
@@ -100,10 +140,16 @@ class ChaseCreditAdapter(BankAdapter):
 
     def parse(self, file_path: str) -> pd.DataFrame:
         """Parse Chase credit card CSV."""
-        df = pd.read_csv(file_path)
+        # Explicit dtypes + usecols skip the type-inference pass and avoid
+        # materializing columns (Post Date, Memo) that are never consumed
+        df = pd.read_csv(
+            file_path,
+            usecols=['Transaction Date', 'Description', 'Amount', 'Type', 'Category'],
+            dtype={'Description': str, 'Amount': 'float64', 'Type': str, 'Category': str},
+        )
 
         standardized = pd.DataFrame({
-            'date': pd.to_datetime(df['Transaction Date']),
+            'date': df['Transaction Date'],
             'description': df['Description'],
             'amount': df['Amount'],
             'type': df['Type'],
@@ -116,40 +162,58 @@ class ChaseCreditAdapter(BankAdapter):
         return standardized
 
 
+# Chase checking dates look like 01/31/2025; used to sniff whether the data
+# rows start with the date (shifted) or the Details field (well-formed)
+_CHASE_DATE_PREFIX_RE = re.compile(rb'\d{1,2}/\d{1,2}/\d{2,4}')
+
+
 class ChaseCheckingAdapter(BankAdapter):
     """Adapter for Chase checking account CSV exports."""
 
+    # Whether the data rows are shifted one column left relative to the
+    # header (trailing commas drop the leading Details field); sniffed in
+    # can_handle from the raw first data row
+    _shifted = False
+
     def can_handle(self, df: pd.DataFrame, file_path: str) -> bool:
         """Check if CSV has Chase checking format."""
         expected_columns = {'Details', 'Posting Date', 'Description', 'Amount', 'Type', 'Balance'}
-        return expected_columns.issubset(set(df.columns))
+        if not expected_columns.issubset(set(df.columns)):
+            return False
+
+        # Sniff the shift from the file itself: a well-formed row starts
+        # with DEBIT/CREDIT, a shifted row starts with the posting date
+        try:
+            with open(file_path, 'rb') as f:
+                f.readline()  # header
+                first_field = f.readline().split(b',', 1)[0]
+            self._shifted = bool(_CHASE_DATE_PREFIX_RE.match(first_field))
+        except OSError:
+            self._shifted = False
+
+        return True
 
     def parse(self, file_path: str) -> pd.DataFrame:
         """Parse Chase checking CSV."""
-        # This CSV has trailing commas that create extra empty columns
-        # Need to read with explicit column names to handle this properly
-        df = pd.read_csv(file_path)
-
-        # Check if columns are misaligned (happens with trailing commas)
-        if 'Posting Date' in df.columns and df['Posting Date'].dtype == 'object':
-            # Columns shifted - first value is in wrong column
-            # Actual structure: Details(CREDIT/DEBIT), Posting Date, Description, Amount, Type, Balance, Check#, empty
-            standardized = pd.DataFrame({
-                'date': pd.to_datetime(df['Details']),  # Date is in Details column
-                'description': df['Posting Date'].astype(str),  # Description is in Posting Date column
-                'amount': pd.to_numeric(df['Description']),  # Amount is in Description column
-                'type': df['Amount'],  # Type is in Amount column (CREDIT/DEBIT originally, but ACH_CREDIT etc now)
-                'category': 'Checking'  # Generic category for checking transactions
-            })
+        # The shift was decided in can_handle from the raw first data row,
+        # so one read with fixed positional names replaces the old
+        # parse-everything-then-inspect-dtypes round trip
+        if self._shifted:
+            # Structure: date, description, amount, type, [balance, check#, ...]
+            standardized = pd.read_csv(
+                file_path, header=None, skiprows=1, usecols=[0, 1, 2, 3],
+                names=['date', 'description', 'amount', 'type'],
+                dtype={'description': str, 'amount': 'float64', 'type': str},
+            )
+            standardized['category'] = 'Checking'  # Generic category for checking transactions
         else:
-            # Normal case
-            standardized = pd.DataFrame({
-                'date': pd.to_datetime(df['Posting Date']),
-                'description': df['Description'].astype(str),
-                'amount': pd.to_numeric(df['Amount']),
-                'type': df['Details'],
-                'category': df['Type']
-            })
+            # Structure: Details(type), Posting Date, Description, Amount, Type(category), ...
+            df = pd.read_csv(
+                file_path, header=None, skiprows=1, usecols=[0, 1, 2, 3, 4],
+                names=['type', 'date', 'description', 'amount', 'category'],
+                dtype={'type': str, 'description': str, 'amount': 'float64', 'category': str},
+            )
+            standardized = df[['date', 'description', 'amount', 'type', 'category']]
 
         standardized = self._add_source(standardized)
         standardized = self._add_derived_fields(standardized)
@@ -167,20 +231,27 @@ class SFCUAdapter(BankAdapter):
 
     def parse(self, file_path: str) -> pd.DataFrame:
         """Parse SFCU CSV."""
-        df = pd.read_csv(file_path)
+        df = pd.read_csv(
+            file_path,
+            usecols=['Post Date', 'Description', 'Debit', 'Credit', 'Category'],
+            dtype={'Description': str, 'Debit': 'float64', 'Credit': 'float64', 'Category': str},
+        )
 
         # Convert Debit/Credit to single amount column
         # Debit is negative, Credit is positive
-        df['amount'] = df['Credit'].fillna(0) - df['Debit'].fillna(0)
+        # Drop to numpy once per column (NaN -> 0 during extraction) so the
+        # subtraction is a single ufunc with one output buffer, instead of
+        # two fillna temporaries plus a Series subtraction
+        credit = df['Credit'].to_numpy(dtype='float64', na_value=0.0)
+        debit = df['Debit'].to_numpy(dtype='float64', na_value=0.0)
+        df['amount'] = credit - debit
 
-        # Infer type from Debit/Credit
-        df['type'] = df.apply(
-            lambda row: 'Credit' if pd.notna(row['Credit']) and row['Credit'] != 0 else 'Debit',
-            axis=1
-        )
+        # Infer type from Debit/Credit (vectorized - one C-level pass
+        # instead of a Python lambda per row)
+        df['type'] = np.where(credit != 0, 'Credit', 'Debit')
 
         standardized = pd.DataFrame({
-            'date': pd.to_datetime(df['Post Date']),
+            'date': df['Post Date'],
             'description': df['Description'],
             'amount': df['amount'],
             'type': df['type'],
@@ -196,50 +267,61 @@ class SFCUAdapter(BankAdapter):
 class CitiAdapter(BankAdapter):
     """Adapter for Citi credit card CSV exports."""
 
+    # Data header offset recorded during can_handle's scan so parse
+    # doesn't have to rescan the file for it
+    _header_row = 0
+
     def can_handle(self, df: pd.DataFrame, file_path: str) -> bool:
         """Check if CSV has Citi format by looking at file content."""
-        # Citi CSVs have metadata rows at the top, so we need to check the file directly
+        # Citi CSVs have metadata rows at the top, so check the file
+        # directly; the same pass records the data header offset for parse
+        is_citi = False
+        header_row = 0
         try:
-            with open(file_path, 'r') as f:
-                first_lines = [f.readline() for _ in range(5)]
-                # Look for Citi-specific patterns
-                content = ''.join(first_lines)
-                if 'Card:' in content or 'Time period of report:' in content:
-                    return True
-        except:
-            pass
-        return False
+            with open(file_path, 'rb') as f:
+                for i, line in enumerate(f):
+                    if i < 5 and (b'Card:' in line or b'Time period of report:' in line):
+                        is_citi = True
+                    if b'Date,Description,Debit,Credit' in line:
+                        header_row = i
+                        break
+                    if i >= 5 and not is_citi:
+                        return False
+        except OSError:
+            return False
+
+        if is_citi:
+            self._header_row = header_row
+        return is_citi
 
     def parse(self, file_path: str) -> pd.DataFrame:
         """Parse Citi CSV, skipping header metadata."""
-        # Read file and find where actual data starts
-        with open(file_path, 'r') as f:
-            lines = f.readlines()
-
-        # Find the header row (contains "Date,Description,Debit,Credit")
-        header_row = 0
-        for i, line in enumerate(lines):
-            if 'Date,Description,Debit,Credit' in line:
-                header_row = i
-                break
+        # Header row (contains "Date,Description,Debit,Credit") was found
+        # during dispatch; fall back to a scan if parse is called directly
+        header_row = self._header_row or _find_header_row(file_path, b'Date,Description,Debit,Credit')
 
         # Read CSV starting from the header row
-        df = pd.read_csv(file_path, skiprows=header_row)
+        # Debit/Credit come in as $-formatted strings, so read them as str
+        # up front instead of letting inference box them per cell
+        df = pd.read_csv(
+            file_path,
+            skiprows=header_row,
+            usecols=['Date', 'Description', 'Debit', 'Credit', 'Category'],
+            dtype={'Description': str, 'Debit': str, 'Credit': str, 'Category': str},
+        )
 
         # Convert Debit/Credit to single amount column
         # Debit is negative, Credit is positive
-        df['Debit'] = pd.to_numeric(df['Debit'].replace(r'[\$,]', '', regex=True), errors='coerce').fillna(0)
-        df['Credit'] = pd.to_numeric(df['Credit'].replace(r'[\$,]', '', regex=True), errors='coerce').fillna(0)
+        # Plain substring replaces avoid the regex engine on every cell
+        df['Debit'] = pd.to_numeric(_strip_money(df['Debit']), errors='coerce').fillna(0)
+        df['Credit'] = pd.to_numeric(_strip_money(df['Credit']), errors='coerce').fillna(0)
         df['amount'] = df['Credit'] - df['Debit']
 
-        # Infer type from Debit/Credit
-        df['type'] = df.apply(
-            lambda row: 'Credit' if row['Credit'] != 0 else 'Debit',
-            axis=1
-        )
+        # Infer type from Debit/Credit (vectorized)
+        df['type'] = np.where(df['Credit'].to_numpy() != 0, 'Credit', 'Debit')
 
         standardized = pd.DataFrame({
-            'date': pd.to_datetime(df['Date']),
+            'date': df['Date'],
             'description': df['Description'],
             'amount': df['amount'],
             'type': df['type'],
@@ -255,49 +337,66 @@ class CitiAdapter(BankAdapter):
 class BofAAdapter(BankAdapter):
     """Adapter for Bank of America CSV exports."""
 
+    # Data header offset recorded during can_handle's scan so parse
+    # doesn't have to rescan the file for it
+    _header_row = 0
+
     def can_handle(self, df: pd.DataFrame, file_path: str) -> bool:
         """Check if CSV has BofA format by looking at file content."""
-        # BofA CSVs have summary rows at the top
+        # BofA CSVs have summary rows at the top; one pass both detects
+        # them and records the data header offset for parse
+        seen_balance = seen_credits = False
+        header_row = 0
         try:
-            with open(file_path, 'r') as f:
-                first_lines = [f.readline() for _ in range(10)]
-                content = ''.join(first_lines)
-                if 'Beginning balance' in content and 'Total credits' in content:
-                    return True
-        except:
-            pass
-        return False
+            with open(file_path, 'rb') as f:
+                for i, line in enumerate(f):
+                    if i < 10:
+                        if b'Beginning balance' in line:
+                            seen_balance = True
+                        if b'Total credits' in line:
+                            seen_credits = True
+                    if b'Date,Description,Amount,Running Bal' in line:
+                        header_row = i
+                        break
+                    if i >= 10 and not (seen_balance and seen_credits):
+                        return False
+        except OSError:
+            return False
+
+        if seen_balance and seen_credits:
+            self._header_row = header_row
+        return seen_balance and seen_credits
 
     def parse(self, file_path: str) -> pd.DataFrame:
         """Parse BofA CSV, skipping header summary."""
-        # Read file and find where actual data starts
-        with open(file_path, 'r') as f:
-            lines = f.readlines()
-
-        # Find the data header row (contains "Date,Description,Amount,Running Bal.")
-        header_row = 0
-        for i, line in enumerate(lines):
-            if 'Date,Description,Amount,Running Bal' in line:
-                header_row = i
-                break
+        # Header row (contains "Date,Description,Amount,Running Bal.") was
+        # found during dispatch; fall back to a scan if parse is called directly
+        header_row = self._header_row or _find_header_row(file_path, b'Date,Description,Amount,Running Bal')
 
         # Read CSV starting from the header row
-        df = pd.read_csv(file_path, skiprows=header_row)
+        # Amounts contain thousands separators, so keep them as str for the
+        # cleanup pass below
+        df = pd.read_csv(
+            file_path,
+            skiprows=header_row,
+            usecols=lambda c: c in ('Date', 'Description', 'Amount'),
+            dtype={'Description': str, 'Amount': str},
+        )
 
         # Skip the "Beginning balance" row
         df = df[~df['Description'].str.contains('Beginning balance', na=False)]
 
         # Clean amount column (remove commas and convert to float)
-        df['Amount'] = pd.to_numeric(df['Amount'].replace(r'[\$,]', '', regex=True), errors='coerce')
+        df['Amount'] = pd.to_numeric(_strip_money(df['Amount']), errors='coerce')
 
-        # Infer type from amount (positive = credit, negative = debit)
-        df['type'] = df['Amount'].apply(lambda x: 'Credit' if x > 0 else 'Debit')
+        # Infer type from amount (positive = credit, negative = debit), vectorized
+        df['type'] = np.where(df['Amount'].to_numpy() > 0, 'Credit', 'Debit')
 
         # Extract category from description if possible, otherwise mark as 'Uncategorized'
         df['category'] = 'Uncategorized'
 
         standardized = pd.DataFrame({
-            'date': pd.to_datetime(df['Date']),
+            'date': df['Date'],
             'description': df['Description'],
             'amount': df['Amount'],
             'type': df['type'],
@@ -313,6 +412,16 @@ class BofAAdapter(BankAdapter):
 class BankDetector:
     """Automatically detect which bank adapter to use for a given CSV."""
 
+    # Header-based formats: expected column set -> adapter class. Matched
+    # with a subset test because real exports often carry extra columns
+    # (Balance, Memo, trailing unnamed columns). Only the matched adapter
+    # is ever constructed - no per-candidate probing
+    _COLUMN_ADAPTERS = (
+        (frozenset({'Transaction Date', 'Post Date', 'Description', 'Category', 'Type', 'Amount', 'Memo'}), ChaseCreditAdapter),
+        (frozenset({'Details', 'Posting Date', 'Description', 'Amount', 'Type', 'Balance'}), ChaseCheckingAdapter),
+        (frozenset({'Account Number', 'Post Date', 'Description', 'Debit', 'Credit', 'Category', 'Status', 'Balance'}), SFCUAdapter),
+    )
+
     @staticmethod
     def detect_and_parse(file_path: str) -> pd.DataFrame:
         """
@@ -332,25 +441,40 @@ class BankDetector:
         filename = os.path.basename(file_path)
         source_id = filename.replace('.csv', '').replace('.CSV', '')
 
-        # Try to read first few rows to check format
+        # One 4KB prefix read settles the metadata-prefixed formats
+        # (Citi/BofA) without parsing a sample or probing other adapters
         try:
-            df_sample = pd.read_csv(file_path, nrows=5)
-        except:
-            df_sample = pd.DataFrame()
-
-        # Initialize all adapters
-        adapters = [
-            CitiAdapter(source_id),      # Check Citi first (has metadata)
-            BofAAdapter(source_id),       # Check BofA second (has metadata)
-            ChaseCreditAdapter(source_id),
-            ChaseCheckingAdapter(source_id),
-            SFCUAdapter(source_id),
-        ]
-
-        # Find matching adapter
-        for adapter in adapters:
-            if adapter.can_handle(df_sample, file_path):
-                print(f"✓ Detected {adapter.__class__.__name__} for {filename}")
-                return adapter.parse(file_path)
+            with open(file_path, 'rb') as f:
+                prefix = f.read(4096)
+        except OSError:
+            prefix = b''
+
+        adapter = None
+        df_sample = pd.DataFrame()
+
+        if b'Card:' in prefix or b'Time period of report:' in prefix:
+            adapter = CitiAdapter(source_id)
+        elif b'Beginning balance' in prefix and b'Total credits' in prefix:
+            adapter = BofAAdapter(source_id)
+        else:
+            # Header-based formats: read a small sample and look its column
+            # set up in the dispatch table; the python engine tolerates
+            # ragged rows in malformed exports
+            try:
+                df_sample = pd.read_csv(file_path, nrows=5, engine='python')
+            except:
+                pass
+
+            sample_columns = frozenset(df_sample.columns)
+            for expected, adapter_cls in BankDetector._COLUMN_ADAPTERS:
+                if expected <= sample_columns:
+                    adapter = adapter_cls(source_id)
+                    break
+
+        # can_handle both confirms the match and records per-file parse
+        # state (Citi/BofA header offsets, Chase checking column shift)
+        if adapter is not None and adapter.can_handle(df_sample, file_path):
+            print(f"✓ Detected {adapter.__class__.__name__} for {filename}")
+            return adapter.parse(file_path)
 
         raise ValueError(f"Could not detect bank format for {file_path}")
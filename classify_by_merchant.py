@@ -1,7 +1,13 @@
 import pandas as pd
 import anthropic
 import json
+import orjson
 import os
+import re
+import shelve
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from dotenv import load_dotenv
 
@@ -22,20 +28,25 @@ client = anthropic.Anthropic(api_key=api_key)
 with open('categories.json', 'r') as f:
     category_config = json.load(f)
 
-def classify_merchants_batch(merchants_batch):
-    """Send batch of unique merchants to Claude for classification"""
+MODEL = "claude-sonnet-4-20250514"
 
-    # Format merchants for the prompt
-    merchants_list = []
-    for idx, merchant_info in enumerate(merchants_batch):
-        merchants_list.append({
-            "id": idx,
-            "merchant": merchant_info['description'],
-            "transaction_count": merchant_info['count'],
-            "avg_amount": round(merchant_info['avg_amount'], 2),
-            "total_amount": round(merchant_info['total_amount'], 2),
-            "transaction_type": merchant_info['transaction_type']
-        })
+# Rows per pd.read_csv chunk - keeps memory bounded on multi-year inputs
+CHUNK_SIZE = 200_000
+
+# Persistent merchant classification cache - merchant strings repeat month
+# over month, so re-imports skip the LLM for everything seen before
+MERCHANT_CACHE_PATH = 'data/merchant_cache'
+
+# Trailing numeric runs (store numbers, reference IDs) vary per transaction
+# but don't change the merchant, so strip them from the cache key
+_NUMERIC_SUFFIX_RE = re.compile(r'\s+\d{3,}')
+
+def normalize_merchant(description):
+    """Normalize a merchant description into a stable cache key"""
+    return _NUMERIC_SUFFIX_RE.sub('', description.lower()).strip()
+
+def _build_system_prompt():
+    """Build the static classification context shared by every batch"""
 
     # Build subcategory information for prompt
     subcategory_info = ""
@@ -48,7 +59,7 @@ def classify_merchants_batch(merchants_batch):
             subcategory_info += "\nSubcategory Examples:\n"
             subcategory_info += json.dumps(category_config['subcategory_examples'], indent=2)
 
-    prompt = f"""Review these unique merchants/descriptions and categorize them appropriately.
+    return f"""You review unique merchants/descriptions from bank statements and categorize them appropriately.
 
 Available Categories: {', '.join(category_config['categories'])}
 
@@ -56,9 +67,6 @@ Category Examples:
 {json.dumps(category_config['examples'], indent=2)}
 {subcategory_info}
 
-Unique merchants to classify (with transaction count, amounts, and transaction type):
-{json.dumps(merchants_list, indent=2)}
-
 IMPORTANT CATEGORIZATION RULES:
 1. Transaction Type matters:
    - "Credit" type = likely Income, Transfers, or Refunds
@@ -99,44 +107,145 @@ If no subcategory applies or category has no subcategories, use null.
 
 Return ONLY the JSON array, no other text."""
 
-    message = client.messages.create(
-        model="claude-sonnet-4-20250514",
-        max_tokens=4000,
-        messages=[{"role": "user", "content": prompt}]
-    )
 
-    # Parse response
-    response_text = message.content[0].text
-    # Extract JSON from response (handling markdown code blocks)
-    if "```json" in response_text:
-        response_text = response_text.split("```json")[1].split("```")[0]
-    elif "```" in response_text:
-        response_text = response_text.split("```")[1].split("```")[0]
+# Computed once at import: the rules/examples block is identical for every
+# batch. Marking it with cache_control lets Anthropic cache the prefix, so
+# each request only pays for the (small) merchant list
+SYSTEM_PROMPT = _build_system_prompt()
+_CACHED_SYSTEM = [{"type": "text", "text": SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}}]
+
+
+def build_classification_prompt(merchants_batch):
+    """Build the per-batch user message listing the merchants to classify"""
+
+    # Format merchants for the prompt
+    merchants_list = []
+    for idx, merchant_info in enumerate(merchants_batch):
+        merchants_list.append({
+            "id": idx,
+            "merchant": merchant_info['description'],
+            "transaction_count": merchant_info['count'],
+            "avg_amount": round(merchant_info['avg_amount'], 2),
+            "total_amount": round(merchant_info['total_amount'], 2),
+            "transaction_type": merchant_info['transaction_type']
+        })
+
+    return f"""Unique merchants to classify (with transaction count, amounts, and transaction type):
+{json.dumps(merchants_list, indent=2)}"""
+
+# Strips leading/trailing markdown code fences in one pass
+_FENCE_RE = re.compile(r'^```(?:json)?|```$', re.MULTILINE)
+
+def parse_classification_response(response_text):
+    """Parse the JSON array of classifications out of a model response"""
+
+    # Drop markdown code fences, then decode with orjson (several times
+    # faster than the stdlib decoder on these multi-KB responses)
+    response_text = _FENCE_RE.sub('', response_text.strip()).strip()
 
     try:
-        return json.loads(response_text.strip())
-    except json.JSONDecodeError as e:
+        return orjson.loads(response_text)
+    except orjson.JSONDecodeError as e:
         # Save problematic response for debugging
         print(f"JSON parsing error: {e}")
         print(f"Response (first 500 chars): {response_text[:500]}")
         raise
 
-def process_transactions_by_merchant(csv_path, batch_size=50):
-    """Process transactions by grouping unique merchants"""
+def classify_merchants_batch(merchants_batch):
+    """Send batch of unique merchants to Claude for classification"""
 
-    # Read CSV
-    df = pd.read_csv(csv_path)
+    message = client.messages.create(
+        model=MODEL,
+        max_tokens=4000,
+        system=_CACHED_SYSTEM,
+        messages=[{"role": "user", "content": build_classification_prompt(merchants_batch)}]
+    )
+
+    return parse_classification_response(message.content[0].text)
+
+def classify_merchants_via_batch_api(batches, poll_interval=30):
+    """
+    Classify all batches in one Message Batches API submission.
+
+    The batches endpoint processes requests asynchronously at ~50% of the
+    per-request price, so it is the cheaper option when you don't need
+    interactive turnaround. Results come back keyed by custom_id, so
+    ordering doesn't matter; returns {batch_num: classifications}.
+    """
+    batch_job = client.messages.batches.create(
+        requests=[
+            {
+                "custom_id": f"batch-{batch_num}",
+                "params": {
+                    "model": MODEL,
+                    "max_tokens": 4000,
+                    "system": _CACHED_SYSTEM,
+                    "messages": [{"role": "user", "content": build_classification_prompt(batch)}]
+                }
+            }
+            for batch_num, batch in enumerate(batches)
+        ]
+    )
 
-    print(f"Total transactions: {len(df)}")
+    print(f"Submitted batch job {batch_job.id} ({len(batches)} requests), polling...")
 
-    # Group by description to get unique merchants
-    merchant_stats = df.groupby('description').agg({
-        'amount': ['count', 'mean', 'sum'],
-        'category': 'first',  # Keep original bank category
-        'type': 'first'  # Keep transaction type (Credit/Debit/etc)
-    }).reset_index()
+    while batch_job.processing_status == "in_progress":
+        time.sleep(poll_interval)
+        batch_job = client.messages.batches.retrieve(batch_job.id)
 
-    merchant_stats.columns = ['description', 'count', 'avg_amount', 'total_amount', 'bank_category', 'transaction_type']
+    results = {}
+    for entry in client.messages.batches.results(batch_job.id):
+        batch_num = int(entry.custom_id.split('-')[1])
+        if entry.result.type == "succeeded":
+            results[batch_num] = parse_classification_response(
+                entry.result.message.content[0].text
+            )
+        else:
+            print(f"✗ Batch {batch_num + 1} failed: {entry.result.type}")
+
+    return results
+
+def process_transactions_by_merchant(csv_path, batch_size=50, use_batch_api=False):
+    """Process transactions by grouping unique merchants"""
+
+    # Stream the CSV in bounded chunks rather than loading it whole, so
+    # multi-year merged statements don't blow up memory. Each chunk yields a
+    # partial per-merchant aggregate; the partials are combined below.
+    total_transactions = 0
+    partials = []
+    for chunk in pd.read_csv(csv_path, chunksize=CHUNK_SIZE):
+        total_transactions += len(chunk)
+
+        # These string columns repeat heavily across transactions; category
+        # dtype lets the groupby hash small integer codes instead of strings
+        for col in ('description', 'type', 'category'):
+            chunk[col] = chunk[col].astype('category')
+
+        # Named aggregation gives flat output columns directly (no
+        # MultiIndex flatten + relabel); sort=False skips an unneeded key
+        # sort - the only ordering that matters is sort_values('count') below
+        partials.append(
+            chunk.groupby('description', sort=False, observed=True).agg(
+                count=('amount', 'count'),
+                total_amount=('amount', 'sum'),
+                bank_category=('category', 'first'),  # Keep original bank category
+                transaction_type=('type', 'first')  # Keep transaction type (Credit/Debit/etc)
+            ).reset_index()
+        )
+
+    print(f"Total transactions: {total_transactions}")
+
+    # Combine the partial aggregates: counts and sums add, and 'first'
+    # stays correct because chunks arrive in file order
+    merchant_stats = pd.concat(partials, ignore_index=True).groupby(
+        'description', sort=False
+    ).agg(
+        count=('count', 'sum'),
+        total_amount=('total_amount', 'sum'),
+        bank_category=('bank_category', 'first'),
+        transaction_type=('transaction_type', 'first')
+    ).reset_index()
+    merchant_stats['avg_amount'] = merchant_stats['total_amount'] / merchant_stats['count']
 
     # Sort by transaction count (most frequent first)
     merchant_stats = merchant_stats.sort_values('count', ascending=False)
@@ -145,85 +254,145 @@ def process_transactions_by_merchant(csv_path, batch_size=50):
     print(f"\nTop 10 most frequent merchants:")
     print(merchant_stats.head(10)[['description', 'count', 'avg_amount']])
 
-    # Process merchants in batches
     merchant_categories = {}
+
+    # Serve previously classified merchants from the on-disk cache so only
+    # genuinely new merchants hit the API
+    os.makedirs('data', exist_ok=True)
+    with shelve.open(MERCHANT_CACHE_PATH) as cache:
+        cached_keys = set(cache)
+        norm_keys = merchant_stats['description'].map(normalize_merchant)
+        is_cached = norm_keys.isin(cached_keys)
+
+        for description, key, count in zip(
+            merchant_stats['description'][is_cached],
+            norm_keys[is_cached],
+            merchant_stats['count'][is_cached],
+        ):
+            hit = cache[key]
+            merchant_categories[description] = {
+                'ai_category': hit['category'],
+                'ai_subcategory': hit['subcategory'],
+                'confidence': hit['confidence'],
+                'reasoning': hit['reasoning'],
+                'transaction_count': count
+            }
+
+    if is_cached.any():
+        print(f"Cache hits: {int(is_cached.sum())} merchants (skipping API)")
+        merchant_stats = merchant_stats[~is_cached]
+
+    # Process the remaining merchants in batches
+    new_merchants = set(merchant_stats['description'])
     total_merchants = len(merchant_stats)
     num_batches = (total_merchants + batch_size - 1) // batch_size
 
     print(f"\nProcessing {total_merchants} unique merchants in {num_batches} batches of {batch_size}...")
 
-    for batch_num in range(num_batches):
-        start_idx = batch_num * batch_size
-        end_idx = min(start_idx + batch_size, total_merchants)
-
-        print(f"\nBatch {batch_num + 1}/{num_batches}: Processing merchants {start_idx + 1}-{end_idx}...")
-
-        # Get batch of merchants
-        batch_merchants = merchant_stats.iloc[start_idx:end_idx].to_dict('records')
+    # Convert to records once up front; slicing a list per batch is free,
+    # where .iloc[...].to_dict('records') rebuilds dicts for every batch
+    merchant_records = merchant_stats.to_dict('records')
+    batches = [
+        merchant_records[i:i + batch_size]
+        for i in range(0, total_merchants, batch_size)
+    ]
+
+    def store_batch(batch_num, classifications):
+        for merchant_info, classification in zip(batches[batch_num], classifications):
+            merchant_categories[merchant_info['description']] = {
+                'ai_category': classification['category'],
+                'ai_subcategory': classification.get('subcategory'),
+                'confidence': classification['confidence'],
+                'reasoning': classification.get('reasoning', ''),
+                'transaction_count': merchant_info['count']
+            }
+
+    def store_batch_error(batch_num, error):
+        for merchant_info in batches[batch_num]:
+            merchant_categories[merchant_info['description']] = {
+                'ai_category': 'ERROR',
+                'ai_subcategory': None,
+                'confidence': 'low',
+                'reasoning': str(error),
+                'transaction_count': merchant_info['count']
+            }
+
+    if use_batch_api:
+        # Single asynchronous submission - slower turnaround, half the cost
+        batch_results = classify_merchants_via_batch_api(batches)
+        for batch_num in range(num_batches):
+            if batch_num in batch_results:
+                store_batch(batch_num, batch_results[batch_num])
+            else:
+                store_batch_error(batch_num, 'Batch API request failed')
+    else:
+        # The work is network-bound, so run batches concurrently; max_workers
+        # caps in-flight requests to stay under Anthropic rate limits
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = {
+                executor.submit(classify_merchants_batch, batch): batch_num
+                for batch_num, batch in enumerate(batches)
+            }
+
+            for future in as_completed(futures):
+                batch_num = futures[future]
+                try:
+                    classifications = future.result()
+                    store_batch(batch_num, classifications)
+                    print(f"✓ Batch {batch_num + 1}/{num_batches} completed ({len(classifications)} merchants)")
+                except Exception as e:
+                    print(f"✗ Error processing batch {batch_num + 1}/{num_batches}: {e}")
+                    store_batch_error(batch_num, e)
+
+    # Persist new classifications (not ERROR placeholders) for future runs
+    with shelve.open(MERCHANT_CACHE_PATH) as cache:
+        for description in new_merchants:
+            info = merchant_categories.get(description)
+            if info and info['ai_category'] != 'ERROR':
+                cache[normalize_merchant(description)] = {
+                    'category': info['ai_category'],
+                    'subcategory': info['ai_subcategory'],
+                    'confidence': info['confidence'],
+                    'reasoning': info['reasoning'],
+                    'model_version': MODEL
+                }
 
-        try:
-            # Classify entire batch
-            classifications = classify_merchants_batch(batch_merchants)
+    # Apply merchant categories to all transactions with a vectorized merge
+    # instead of a per-row Python loop, streaming the CSV a second time so
+    # the classified output never has to fit in memory either
+    print("\nApplying categories to all transactions...")
 
-            # Store results
-            for merchant_info, classification in zip(batch_merchants, classifications):
-                merchant_categories[merchant_info['description']] = {
-                    'ai_category': classification['category'],
-                    'ai_subcategory': classification.get('subcategory'),
-                    'confidence': classification['confidence'],
-                    'reasoning': classification.get('reasoning', ''),
-                    'transaction_count': merchant_info['count']
-                }
+    cat_df = pd.DataFrame.from_dict(merchant_categories, orient='index')
+    cat_df.index.name = 'description'
+    cat_df = cat_df.reset_index().drop(columns=['transaction_count'])
 
-            print(f"✓ Batch {batch_num + 1} completed ({len(classifications)} merchants)")
+    output_columns = [
+        'date', 'description', 'amount', 'type', 'bank_category',
+        'ai_category', 'ai_subcategory', 'confidence', 'reasoning',
+        'source', 'month', 'year'
+    ]
 
-        except Exception as e:
-            print(f"✗ Error processing batch {batch_num + 1}: {e}")
+    os.makedirs('data/3_classified', exist_ok=True)
+    output_filename = f"data/3_classified/classified_by_merchant_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
 
-            # Add all merchants in failed batch as errors
-            for merchant_info in batch_merchants:
-                merchant_categories[merchant_info['description']] = {
-                    'ai_category': 'ERROR',
-                    'ai_subcategory': None,
-                    'confidence': 'low',
-                    'reasoning': str(e),
-                    'transaction_count': merchant_info['count']
-                }
+    category_counts = Counter()
+    error_count = 0
 
-    # Apply merchant categories to all transactions
-    print("\nApplying categories to all transactions...")
+    for i, chunk in enumerate(pd.read_csv(csv_path, chunksize=CHUNK_SIZE)):
+        out_chunk = chunk.rename(columns={'category': 'bank_category'}).merge(
+            cat_df, on='description', how='left'
+        )
 
-    results = []
-    for _, row in df.iterrows():
-        merchant = row['description']
-        merchant_cat = merchant_categories.get(merchant, {
-            'ai_category': 'ERROR',
-            'ai_subcategory': None,
-            'confidence': 'low',
-            'reasoning': 'Merchant not found',
-            'transaction_count': 0
-        })
+        # Merchants missing from the mapping (shouldn't happen) get error markers
+        out_chunk['ai_category'] = out_chunk['ai_category'].fillna('ERROR')
+        out_chunk['confidence'] = out_chunk['confidence'].fillna('low')
+        out_chunk['reasoning'] = out_chunk['reasoning'].fillna('Merchant not found')
 
-        results.append({
-            'date': row['date'],
-            'description': row['description'],
-            'amount': row['amount'],
-            'type': row['type'],
-            'bank_category': row['category'],
-            'ai_category': merchant_cat['ai_category'],
-            'ai_subcategory': merchant_cat['ai_subcategory'],
-            'confidence': merchant_cat['confidence'],
-            'reasoning': merchant_cat['reasoning'],
-            'source': row['source'],
-            'month': row['month'],
-            'year': row['year']
-        })
+        out_chunk = out_chunk[output_columns]
+        out_chunk.to_csv(output_filename, mode='a' if i else 'w', header=(i == 0), index=False)
 
-    # Save results
-    output_df = pd.DataFrame(results)
-    os.makedirs('data/3_classified', exist_ok=True)
-    output_filename = f"data/3_classified/classified_by_merchant_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-    output_df.to_csv(output_filename, index=False)
+        category_counts.update(out_chunk['ai_category'].value_counts().to_dict())
+        error_count += int((out_chunk['ai_category'] == 'ERROR').sum())
 
     # Also save merchant mapping for reference
     merchant_mapping_df = pd.DataFrame([
@@ -246,24 +415,23 @@ def process_transactions_by_merchant(csv_path, batch_size=50):
     print("=" * 80)
     print(f"\nResults saved to: {output_filename}")
     print(f"Merchant mapping saved to: {mapping_filename}")
-    print(f"\nTotal transactions: {len(results)}")
+    print(f"\nTotal transactions: {total_transactions}")
     print(f"Unique merchants classified: {len(merchant_categories)}")
     print(f"API calls made: {num_batches} (batch size: {batch_size})")
-    print(f"Average merchants per batch: {len(merchant_categories) / num_batches:.1f}")
-    print(f"Transactions per API call: {len(results) / num_batches:.1f}")
+    if num_batches:
+        print(f"Average merchants per batch: {total_merchants / num_batches:.1f}")
+        print(f"Transactions per API call: {total_transactions / num_batches:.1f}")
 
     # Show category distribution
     print("\nCategory distribution:")
-    category_dist = output_df['ai_category'].value_counts()
-    for category, count in category_dist.items():
+    for category, count in category_counts.most_common():
         print(f"  {category}: {count} transactions")
 
     # Show errors if any
-    errors = output_df[output_df['ai_category'] == 'ERROR']
-    if len(errors) > 0:
-        print(f"\nErrors: {len(errors)} transactions")
+    if error_count > 0:
+        print(f"\nErrors: {error_count} transactions")
 
-    return output_df, merchant_mapping_df
+    return output_filename, merchant_mapping_df
 
 if __name__ == "__main__":
     # Process the merged transactions file
@@ -273,7 +441,7 @@ if __name__ == "__main__":
     print(f"Processing: {csv_file}")
     print(f"{'='*80}\n")
 
-    transactions_df, merchants_df = process_transactions_by_merchant(csv_file, batch_size=50)
+    output_file, merchants_df = process_transactions_by_merchant(csv_file, batch_size=50)
 
     print("\n" + "=" * 80)
     print("Top 20 merchants by transaction count:")
@@ -6,11 +6,16 @@ Runs test cases from test_cases.csv against the golden dataset
 and validates the agent's responses.
 """
 
+import io
 import os
 import re
 import csv
-import json
+import shelve
 import asyncio
+import hashlib
+import orjson
+import argparse
+from collections import namedtuple
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Any, Optional
@@ -30,6 +35,12 @@ GOLDEN_DATASET_PATH = os.environ.get('FINANCE_DB_PATH', str(EVALS_DIR / "golden_
 # Ensure results directory exists
 RESULTS_DIR.mkdir(exist_ok=True)
 
+# On-disk answer cache so incremental runs (tweaking validation logic,
+# re-running after a failure) don't re-invoke the LLM for unchanged tests.
+# Bump AGENT_VERSION whenever agent behavior changes to invalidate it.
+AGENT_VERSION = "nl2sql-v2"
+ANSWER_CACHE_PATH = str(RESULTS_DIR / "answer_cache")
+
 # Import agent after setting env var
 from google.adk import Runner
 from google.adk.sessions import InMemorySessionService
@@ -37,13 +48,50 @@ from google.genai import types
 from agent.agent import root_agent
 
 
+# Validation patterns, compiled once at import instead of going through the
+# re module's cache on every call
+_SQL_BLOCK_RE = re.compile(r'```(?:sql)?\s*.*?```', re.DOTALL)
+_DOLLAR_RE = re.compile(r'-?\$[\d,]+\.?\d*')
+_NUM_RE = re.compile(r'-?\d+\.?\d*')
+_YEAR_RE = re.compile(r'^20[2-3]\d$')
+
+# Phrases that signal an empty result. Joined into one alternation (longest
+# first, so overlapping phrasings prefer the more specific wording) and
+# matched in a single pass instead of one substring scan per phrase
+_NO_DATA_PHRASES = [
+    "no transactions",
+    "no data",
+    "didn't find",
+    "did not find",
+    "haven't",
+    "don't have",
+    "do not have",
+    "not found",
+    "no spending",
+    "no records",
+    "no results",
+    "cannot find",
+    "could not find",
+    "no matching",
+    "$0",
+    "0.00",
+]
+_NO_DATA_RE = re.compile('|'.join(
+    re.escape(p) for p in sorted(_NO_DATA_PHRASES, key=len, reverse=True)
+))
+
+# One shared immutable row type instead of a fresh dict per CSV row; field
+# access compiles to a fast attribute lookup at the call sites
+TestCase = namedtuple('TestCase', ['question', 'expected_value', 'answer_type', 'tolerance', 'notes'])
+
+
 class AnswerValidator:
     """Validates agent answers against expected values."""
 
     @staticmethod
     def strip_sql_blocks(text: str) -> str:
         """Remove SQL code blocks from text to avoid extracting numbers from SQL."""
-        return re.sub(r'```(?:sql)?\s*.*?```', '', text, flags=re.DOTALL)
+        return _SQL_BLOCK_RE.sub('', text)
 
     @staticmethod
     def extract_number(text: str) -> Optional[float]:
@@ -54,19 +102,42 @@ class AnswerValidator:
         2. Numbers that aren't 4-digit years (2020-2030)
         3. Any remaining number
         """
+        # Fast path: most answers quote a dollar amount, so a find() plus a
+        # character walk beats stripping SQL and running three regex scans.
+        # Only taken when there is no code fence (fenced SQL could contain
+        # the first '$') and the slice parses cleanly; otherwise fall
+        # through to the regex path below, which behaves exactly as before.
+        idx = text.find('$')
+        if idx != -1 and '```' not in text:
+            end = idx + 1
+            n = len(text)
+            while end < n and (text[end].isdigit() or text[end] in ',.'):
+                end += 1
+            token = text[idx + 1:end].rstrip('.,')
+            # Accept the token only if the dollar regex would have matched
+            # it the same way, so shapes like '$.874' or '$4.,89781' fall
+            # through to the regex path instead of parsing differently
+            if token and _DOLLAR_RE.fullmatch('$' + token):
+                try:
+                    value = float(token.replace(',', ''))
+                    return -value if idx > 0 and text[idx - 1] == '-' else value
+                except ValueError:
+                    pass  # e.g. all-comma run - use the regex path
+
         # Strip SQL code blocks first
         text = AnswerValidator.strip_sql_blocks(text)
 
         # Priority 1: Look for dollar amounts ($X,XXX.XX or $X.XX)
-        dollar_matches = re.findall(r'-?\$[\d,]+\.?\d*', text)
+        dollar_matches = _DOLLAR_RE.findall(text)
         if dollar_matches:
             cleaned = dollar_matches[0].replace('$', '').replace(',', '')
             return float(cleaned)
 
         # Priority 2: Look for numbers that aren't years (2020-2030)
         text_clean = text.replace(',', '')
-        all_matches = re.findall(r'-?\d+\.?\d*', text_clean)
-        non_year_matches = [m for m in all_matches if not re.match(r'^20[2-3]\d$', m)]
+        all_matches = _NUM_RE.findall(text_clean)
+        is_year = _YEAR_RE.match
+        non_year_matches = [m for m in all_matches if not is_year(m)]
 
         if non_year_matches:
             return float(non_year_matches[0])
@@ -151,33 +222,14 @@ class AnswerValidator:
     @staticmethod
     def validate_no_data(agent_answer: str) -> Dict[str, Any]:
         """Validate that answer indicates no data found."""
-        no_data_phrases = [
-            "no transactions",
-            "no data",
-            "didn't find",
-            "did not find",
-            "haven't",
-            "don't have",
-            "do not have",
-            "not found",
-            "no spending",
-            "no records",
-            "no results",
-            "cannot find",
-            "could not find",
-            "no matching",
-            "$0",
-            "0.00",
-        ]
-        
-        answer_lower = agent_answer.lower()
-        found_phrases = [phrase for phrase in no_data_phrases if phrase in answer_lower]
+        # One pass over the answer; dict.fromkeys dedupes repeats in order
+        found_phrases = list(dict.fromkeys(_NO_DATA_RE.findall(agent_answer.lower())))
         passed = len(found_phrases) > 0
-        
+
         return {
             "passed": passed,
             "found_phrases": found_phrases,
-            "checked_phrases": no_data_phrases
+            "checked_phrases": _NO_DATA_PHRASES
         }
 
 
@@ -186,11 +238,17 @@ class EvalRunner:
     
     APP_NAME = "finance_eval"
     USER_ID = "eval_user"
-    DELAY_BETWEEN_TESTS = 5  # seconds between each test to avoid rate limits
+    CONCURRENCY = 4  # simultaneous agent calls
+    REQUESTS_PER_MINUTE = 60  # API rate budget; request starts are spaced to fit
     MAX_RETRIES = 3
     INITIAL_RETRY_DELAY = 10  # seconds, doubles on each retry
 
-    def __init__(self):
+    def __init__(self, use_cache: bool = True, shared_session: bool = False):
+        self.use_cache = use_cache
+        self.shared_session = shared_session
+        self._session = None
+        self._session_lock = asyncio.Lock()
+        self._dataset_digest = self._hash_dataset()
         self.session_service = InMemorySessionService()
         self.runner = Runner(
             app_name=self.APP_NAME,
@@ -199,37 +257,104 @@ class EvalRunner:
         )
         self.validator = AnswerValidator()
         self.results = []
+        self._sem = asyncio.Semaphore(self.CONCURRENCY)
+        self._request_interval = 60.0 / self.REQUESTS_PER_MINUTE
+        self._next_slot = 0.0
+        self._slot_lock = asyncio.Lock()
+        # question -> agent task; duplicate test rows (same question,
+        # different expected values) await one shared call per run
+        self._answer_tasks: Dict[str, asyncio.Task] = {}
+
+    async def _acquire_rate_slot(self):
+        """Wait until the next request start fits the RPM budget."""
+        async with self._slot_lock:
+            now = asyncio.get_running_loop().time()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self._request_interval
+        if wait > 0:
+            await asyncio.sleep(wait)
     
-    def load_test_cases(self) -> List[Dict]:
-        """Load test cases from CSV."""
-        test_cases = []
-        
+    def load_test_cases(self):
+        """Stream test cases from CSV.
+
+        Returns:
+            (total, iterator) - the total comes from a cheap line count so
+            progress can be printed up front, while the rows themselves are
+            yielded lazily from csv.DictReader instead of being
+            materialized into a list.
+        """
         with open(TEST_CASES_PATH, 'r') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                test_cases.append(row)
-        
-        return test_cases
+            total = sum(1 for line in f if line.strip()) - 1  # minus header
+
+        def rows():
+            with open(TEST_CASES_PATH, 'r') as f:
+                reader = csv.reader(f)
+                next(reader)  # header
+                for row in reader:
+                    yield TestCase(*row)
+
+        return total, rows()
     
+    @staticmethod
+    def _hash_dataset() -> str:
+        """Digest of the golden dataset contents, computed once per run.
+
+        Content-based rather than mtime-based, so touching the file without
+        changing it doesn't throw away every cached answer.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        try:
+            with open(GOLDEN_DATASET_PATH, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(block)
+        except OSError:
+            pass  # dataset missing - keys still work, just never invalidate
+        return digest.hexdigest()
+
+    def _cache_key(self, question: str) -> str:
+        """Cache key covering everything a cached answer depends on."""
+        raw = f"{question}|{AGENT_VERSION}|{self._dataset_digest}"
+        return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
     async def run_agent(self, question: str) -> str:
         """Run agent with retry logic for rate limit errors."""
+        key = self._cache_key(question)
+        if self.use_cache:
+            with shelve.open(ANSWER_CACHE_PATH) as cache:
+                if key in cache:
+                    print("  (answer served from cache)")
+                    return cache[key]
+
+        # One session per question by default: concurrent runs on a shared
+        # session interleave each other's turns into every request, and
+        # even serially each answer would see all prior eval Q&A. The
+        # session is still reused across retry attempts. --shared-session
+        # opts into one run-wide session (e.g. to cut round trips on a
+        # persistent backend when running a known-stateless agent).
+        if self.shared_session:
+            session_id = await self._shared_session_id()
+        else:
+            session = await self.session_service.create_session(
+                app_name=self.APP_NAME,
+                user_id=self.USER_ID,
+            )
+            session_id = session.id
+        message = types.Content(
+            role="user",
+            parts=[types.Part.from_text(text=question)],
+        )
+
         for attempt in range(self.MAX_RETRIES):
+            await self._acquire_rate_slot()
             try:
-                session = await self.session_service.create_session(
-                    app_name=self.APP_NAME,
-                    user_id=self.USER_ID,
-                )
-
-                message = types.Content(
-                    role="user",
-                    parts=[types.Part.from_text(text=question)],
-                )
-
-                # Collect all text parts from the final response
-                text_parts = []
+                # Collect all text parts from the final response into one
+                # buffer; the separator goes between parts so no trailing
+                # whitespace needs stripping (which would copy the string)
+                buf = io.StringIO()
+                wrote = False
                 async for event in self.runner.run_async(
                     user_id=self.USER_ID,
-                    session_id=session.id,
+                    session_id=session_id,
                     new_message=message,
                 ):
                     if not event.is_final_response():
@@ -239,9 +364,16 @@ class EvalRunner:
                     for part in event.content.parts:
                         # Skip function_call and function_response parts
                         if hasattr(part, 'text') and part.text:
-                            text_parts.append(part.text)
-
-                return " ".join(text_parts) if text_parts else "No response from agent"
+                            if wrote:
+                                buf.write(' ')
+                            buf.write(part.text)
+                            wrote = True
+
+                answer = buf.getvalue() if wrote else "No response from agent"
+                if self.use_cache:
+                    with shelve.open(ANSWER_CACHE_PATH) as cache:
+                        cache[key] = answer
+                return answer
             except Exception as e:
                 error_str = str(e)
                 if "429" in error_str or "rate" in error_str.lower():
@@ -252,14 +384,38 @@ class EvalRunner:
                 return f"ERROR: {error_str}"
 
         return "ERROR: Max retries exceeded due to rate limiting"
-    
-    def validate_answer(self, agent_answer: str, test_case: Dict) -> Dict[str, Any]:
+
+    async def _shared_session_id(self) -> str:
+        """Lazily create the run-wide session (once, even under concurrency)."""
+        async with self._session_lock:
+            if self._session is None:
+                self._session = await self.session_service.create_session(
+                    app_name=self.APP_NAME,
+                    user_id=self.USER_ID,
+                )
+        return self._session.id
+
+    def _answer_question(self, question: str) -> asyncio.Task:
+        """Get the (shared) agent task for a question, starting it if needed."""
+        task = self._answer_tasks.get(question)
+        if task is None:
+            task = self._answer_tasks[question] = asyncio.ensure_future(
+                self._run_agent_bounded(question)
+            )
+        return task
+
+    async def _run_agent_bounded(self, question: str) -> str:
+        """Run the agent under the concurrency cap."""
+        async with self._sem:
+            return await self.run_agent(question)
+
+    def validate_answer(self, agent_answer: str, test_case: TestCase) -> Dict[str, Any]:
         """Validate agent answer against expected value."""
-        answer_type = test_case['answer_type']
-        expected_value = test_case['expected_value']
-        
+        answer_type = test_case.answer_type
+        expected_value = test_case.expected_value
+
         if answer_type == 'numeric':
-            tolerance = float(test_case['tolerance']) if test_case['tolerance'] else 0.01
+            tolerance = float(test_case.tolerance) if test_case.tolerance else 0.01
             return self.validator.validate_numeric(agent_answer, expected_value, tolerance)
         
         elif answer_type == 'count':
@@ -277,9 +433,9 @@ class EvalRunner:
                 "error": f"Unknown answer_type: {answer_type}"
             }
     
-    async def run_single_test(self, test_case: Dict, test_num: int, total_tests: int) -> Dict:
+    async def run_single_test(self, test_case: TestCase, test_num: int, total_tests: int) -> Dict:
         """Run a single test case."""
-        question = test_case['question']
+        question = test_case.question
 
         print(f"\n{'='*80}")
         print(f"Test {test_num}/{total_tests}: {question}")
@@ -287,16 +443,17 @@ class EvalRunner:
 
         result = {
             "question": question,
-            "expected_value": test_case['expected_value'],
-            "answer_type": test_case['answer_type'],
-            "notes": test_case['notes'],
+            "expected_value": test_case.expected_value,
+            "answer_type": test_case.answer_type,
+            "notes": test_case.notes,
             "timestamp": datetime.now().isoformat()
         }
 
         try:
-            # Run agent
+            # Run agent; duplicate questions share a single in-flight call
+            # and the semaphore caps how many are running at once
             print("Running agent...")
-            agent_answer = await self.run_agent(question)
+            agent_answer = await self._answer_question(question)
             result["agent_answer"] = agent_answer
             
             # Check for errors
@@ -336,18 +493,16 @@ class EvalRunner:
         print(f"Test cases: {TEST_CASES_PATH}")
 
         # Load test cases
-        test_cases = self.load_test_cases()
-        total_tests = len(test_cases)
+        total_tests, test_cases = self.load_test_cases()
         print(f"Total test cases: {total_tests}")
 
-        # Run each test with delay between tests to avoid rate limits
-        results = []
-        for i, test_case in enumerate(test_cases, 1):
-            if i > 1:
-                print(f"\n  Waiting {self.DELAY_BETWEEN_TESTS}s before next test...")
-                await asyncio.sleep(self.DELAY_BETWEEN_TESTS)
-            result = await self.run_single_test(test_case, i, total_tests)
-            results.append(result)
+        # Run tests concurrently: the semaphore bounds in-flight agent
+        # calls and the rate limiter spaces request starts, so there is no
+        # dead time between tests. gather preserves input order in results
+        results = list(await asyncio.gather(*[
+            self.run_single_test(test_case, i, total_tests)
+            for i, test_case in enumerate(test_cases, 1)
+        ]))
         
         # Generate summary
         passed_tests = sum(1 for r in results if r["passed"])
@@ -377,8 +532,9 @@ class EvalRunner:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         output_path = RESULTS_DIR / f"eval_run_{timestamp}.json"
         
-        with open(output_path, 'w') as f:
-            json.dump(summary, f, indent=2)
+        # orjson serializes straight to bytes, several times faster than
+        # the stdlib encoder on reports full of long agent answers
+        output_path.write_bytes(orjson.dumps(summary, option=orjson.OPT_INDENT_2))
         
         print(f"\n{'='*80}")
         print(f"Results saved to: {output_path}")
@@ -415,7 +571,15 @@ class EvalRunner:
 
 async def main():
     """Main entry point."""
-    runner = EvalRunner()
+    parser = argparse.ArgumentParser(description="Run finance agent evals")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Always re-run the agent instead of reusing cached answers")
+    parser.add_argument('--shared-session', action='store_true',
+                        help="Reuse one session for every question instead of isolating "
+                             "each test in its own session (only safe for stateless agents)")
+    args = parser.parse_args()
+
+    runner = EvalRunner(use_cache=not args.no_cache, shared_session=args.shared_session)
     await runner.run_all_tests()
 
 
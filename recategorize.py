@@ -1,27 +1,38 @@
+import re
+
 import pandas as pd
 
 df = pd.read_csv('data/transactions_2024_2025.csv')
 overrides = pd.read_csv('data/category_overrides.csv')
 
-for _, row in overrides.iterrows():
-    pattern = row['description_pattern']
-    correct_category = row['correct_category']
-    
-    # Escape special characters and use partial match
-    import re
-    pattern_escaped = re.escape(pattern)
-    
-    mask = df['description'].str.contains(pattern_escaped, case=False, na=False, regex=True)
-    
-    if mask.sum() > 0:
-        df.loc[mask, 'ai_category'] = correct_category
-        print(f"✓ Updated {mask.sum()} transactions: {pattern} → {correct_category}")
-    else:
-        print(f"✗ No matches found for: {pattern}")
-        # Show similar descriptions
-        similar = df[df['description'].str.contains('TWELVEMONTH', case=False, na=False)]
-        if len(similar) > 0:
-            print(f"  Similar descriptions found:")
-            print(f"  {similar['description'].unique()[:3]}")
+# One vectorized str.contains scan per override, each with its pattern
+# escaped and compiled once up front. An alternation regex can't replicate
+# the old per-row loop exactly (overlapping or nested patterns consume each
+# other's characters), so the loop is kept - applying overrides in CSV
+# order means the last matching row wins, exactly as before.
+patterns = [
+    (re.compile(re.escape(pattern), re.IGNORECASE), pattern, category)
+    for pattern, category in
+    overrides[['description_pattern', 'correct_category']].itertuples(index=False, name=None)
+]
+
+if patterns:
+    # Computed once; only printed when a pattern fails to match
+    similar = None
+
+    for compiled, pattern, correct_category in patterns:
+        row_mask = df['description'].str.contains(compiled, na=False)
+        count = row_mask.sum()
+        if count > 0:
+            df.loc[row_mask, 'ai_category'] = correct_category
+            print(f"✓ Updated {count} transactions: {pattern} → {correct_category}")
+        else:
+            print(f"✗ No matches found for: {pattern}")
+            # Show similar descriptions
+            if similar is None:
+                similar = df[df['description'].str.contains('TWELVEMONTH', case=False, na=False)]
+            if len(similar) > 0:
+                print(f"  Similar descriptions found:")
+                print(f"  {similar['description'].unique()[:3]}")
 
-df.to_csv('data/transactions_2024_2025.csv', index=False)
\ No newline at end of file
+df.to_csv('data/transactions_2024_2025.csv', index=False)
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Pre-render the static prompt fragments into a Python constants module.
+
+format_semantic_layer / format_sql_examples are pure functions of the YAML
+configs, so their output can be computed at build time instead of on every
+process start. This writes agent/subagents/nl2sql/_prompt_constants.py;
+get_nl2sql_instruction_v2 then reduces to a single f-string interpolation.
+
+Run after editing agent/config/*.yaml:
+
+    python scripts/build_prompts.py
+"""
+
+import os
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from agent.subagents.nl2sql import prompts  # noqa: E402
+
+
+def main():
+    semantic_str = prompts.format_semantic_layer(prompts.load_semantic_layer())
+    examples_str = prompts.format_sql_examples(prompts.load_sql_examples(), limit=5)
+
+    # Record the config mtimes so stale constants can be detected at runtime
+    config_mtime_ns = max(
+        os.stat(prompts._get_config_path(name)).st_mtime_ns
+        for name in ('semantic_layer.yaml', 'sql_examples.yaml')
+    )
+
+    out_path = os.path.join(
+        PROJECT_ROOT, 'agent', 'subagents', 'nl2sql', '_prompt_constants.py'
+    )
+
+    with open(out_path, 'w') as f:
+        f.write('"""Generated by scripts/build_prompts.py - do not edit by hand."""\n\n')
+        f.write(f"CONFIG_MTIME_NS = {config_mtime_ns}\n\n")
+        f.write(f"SEMANTIC_LAYER_STR = {semantic_str!r}\n\n")
+        f.write(f"SQL_EXAMPLES_STR = {examples_str!r}\n")
+
+    print(f"Wrote {out_path}")
+
+
+if __name__ == "__main__":
+    main()
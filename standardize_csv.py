@@ -25,18 +25,57 @@ Output:
 """
 
 import os
+import re
 import sys
 import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 import pandas as pd
 from bank_adapters import BankDetector
 
 
+# Filenames that are outputs or config of this pipeline, not bank exports;
+# one compiled alternation replaces a per-file loop of substring scans
+_SKIP_RE = re.compile('|'.join(re.escape(p) for p in (
+    'category_overrides',
+    'transactions_',
+    'reclassified_',
+    '_standardized',
+)))
+
+
 def ensure_directory(path: str) -> None:
     """Create directory if it doesn't exist."""
     Path(path).mkdir(parents=True, exist_ok=True)
 
 
+def _process_one(file_path: str, output_dir: str, skip_individual: bool):
+    """
+    Standardize a single CSV (runs in a worker process).
+
+    Returns:
+        (standardized_df_or_None, messages, error_or_None) - progress output
+        is collected into messages so the parent can print per-file blocks
+        in order instead of interleaving worker output.
+    """
+    messages = []
+    try:
+        filename = os.path.basename(file_path)
+        standardized_df = BankDetector.detect_and_parse(file_path)
+
+        # Save individual file
+        if not skip_individual:
+            output_filename = f"{Path(filename).stem}_standardized.csv"
+            output_path = os.path.join(output_dir, output_filename)
+            standardized_df.to_csv(output_path, index=False)
+            messages.append(f"  → Saved to: {output_path}")
+
+        messages.append(f"  ✓ Processed {len(standardized_df)} transactions\n")
+        return standardized_df, messages, None
+    except Exception as e:
+        return None, messages, str(e)
+
+
 def standardize_files(
     input_files: list,
     output_dir: str = "data/standardized",
@@ -66,45 +105,43 @@ def standardize_files(
     print("=" * 80)
     print(f"\nProcessing {len(input_files)} file(s)...\n")
 
+    # Filter out missing and processed/output files up front
+    worklist = []
     for file_path in input_files:
-        try:
-            # Skip if file doesn't exist
-            if not os.path.exists(file_path):
-                print(f"⚠ Skipping: {file_path} (file not found)")
-                continue
-
-            # Skip processed/output files
-            filename = os.path.basename(file_path)
-            skip_patterns = [
-                'category_overrides',
-                'transactions_',
-                'reclassified_',
-                '_standardized'
-            ]
-            if any(pattern in filename.lower() for pattern in skip_patterns):
-                print(f"⊘ Skipping: {filename} (processed/config file)")
-                continue
-
-            print(f"Processing: {filename}")
-
-            # Detect and parse
-            standardized_df = BankDetector.detect_and_parse(file_path)
-
-            # Save individual file
-            if not skip_individual:
-                output_filename = f"{Path(filename).stem}_standardized.csv"
-                output_path = os.path.join(output_dir, output_filename)
-                standardized_df.to_csv(output_path, index=False)
-                print(f"  → Saved to: {output_path}")
-
-            # Add to merged list
+        if not os.path.exists(file_path):
+            print(f"⚠ Skipping: {file_path} (file not found)")
+            continue
+
+        filename = os.path.basename(file_path)
+        if _SKIP_RE.search(filename.lower()):
+            print(f"⊘ Skipping: {filename} (processed/config file)")
+            continue
+
+        worklist.append(file_path)
+
+    # Each file's parse + normalize is CPU-bound and independent, so fan
+    # out across cores; results are re-ordered to the input order so the
+    # per-file report and the merged output stay deterministic
+    results = [None] * len(worklist)
+    with ProcessPoolExecutor() as executor:
+        futures = {
+            executor.submit(_process_one, fp, output_dir, skip_individual): i
+            for i, fp in enumerate(worklist)
+        }
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+
+    for file_path, (standardized_df, messages, error) in zip(worklist, results):
+        # One write per file instead of one syscall per progress line
+        block = [f"Processing: {os.path.basename(file_path)}"]
+        block.extend(messages)
+        if error is not None:
+            block.append(f"  ✗ Error: {error}\n")
+            failed_files.append((file_path, error))
+        else:
             all_transactions.append(standardized_df)
             processed_count += 1
-            print(f"  ✓ Processed {len(standardized_df)} transactions\n")
-
-        except Exception as e:
-            print(f"  ✗ Error: {str(e)}\n")
-            failed_files.append((file_path, str(e)))
+        sys.stdout.write('\n'.join(block) + '\n')
 
     # Create merged output
     if not skip_merged and all_transactions:
@@ -112,10 +149,14 @@ def standardize_files(
         print("MERGING TRANSACTIONS")
         print("=" * 80)
 
+        # Clearing the list right after the concat drops the per-file frames
+        # before the sort needs its working memory, so peak RSS is one
+        # merged copy rather than two
         merged_df = pd.concat(all_transactions, ignore_index=True)
+        all_transactions.clear()
 
-        # Sort by date
-        merged_df = merged_df.sort_values('date').reset_index(drop=True)
+        # Sort by date (in place - avoids allocating a second merged frame)
+        merged_df.sort_values('date', inplace=True, ignore_index=True)
 
         # Save merged file
         merged_df.to_csv(merged_output, index=False)